@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import gzip
+
 import dask.config
 
+from distributed.http.utils import RequestHandler
+
 
 class PrometheusCollector:
     def __init__(self, server):
@@ -17,3 +21,40 @@ class PrometheusCollector:
             full_name.append(self.subsystem)
         full_name.append(name)
         return "_".join(full_name)
+
+
+def _gzip_accepted(accept_encoding):
+    from prometheus_client.exposition import gzip_accepted
+
+    # gzip_accepted only looks at coding names, so drop any coding the
+    # client explicitly refuses with ``q=0`` first
+    codings = []
+    for coding in (accept_encoding or "").split(","):
+        _, *params = coding.split(";")
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    refused = float(value) == 0
+                except ValueError:
+                    refused = False
+                if refused:
+                    break
+        else:
+            codings.append(coding)
+    return gzip_accepted(",".join(codings))
+
+
+class BasePrometheusHandler(RequestHandler):
+    def get(self):
+        import prometheus_client
+
+        output = prometheus_client.generate_latest()
+        # The exposition format is highly repetitive; honour gzip like
+        # prometheus_client's own HTTP server does
+        if _gzip_accepted(self.request.headers.get("Accept-Encoding")):
+            output = gzip.compress(output)
+            self.set_header("Content-Encoding", "gzip")
+        self.set_header("Vary", "Accept-Encoding")
+        self.write(output)
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 import toolz
 
-from distributed.http.prometheus import PrometheusCollector
+from distributed.http.prometheus import BasePrometheusHandler, PrometheusCollector
 from distributed.http.scheduler.prometheus.semaphore import SemaphoreMetricCollector
-from distributed.http.utils import RequestHandler
 from distributed.scheduler import ALL_TASK_STATES
 
 
@@ -76,7 +75,7 @@ class SchedulerMetricCollector(PrometheusCollector):
 COLLECTORS = [SchedulerMetricCollector, SemaphoreMetricCollector]
 
 
-class PrometheusHandler(RequestHandler):
+class PrometheusHandler(BasePrometheusHandler):
     _collectors = None
 
     def __init__(self, *args, dask_server=None, **kwargs):
@@ -97,9 +96,3 @@ class PrometheusHandler(RequestHandler):
         # Register collectors
         for instantiated_collector in PrometheusHandler._collectors:
             prometheus_client.REGISTRY.register(instantiated_collector)
-
-    def get(self):
-        import prometheus_client
-
-        self.write(prometheus_client.generate_latest())
-        self.set_header("Content-Type", "text/plain; version=0.0.4")
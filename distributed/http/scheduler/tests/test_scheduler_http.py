@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
 import json
 import re
 
@@ -101,6 +102,7 @@ async def test_prometheus(c, s, a, b):
         )
         assert response.code == 200
         assert response.headers["Content-Type"] == "text/plain; version=0.0.4"
+        assert response.headers["X-Consumed-Content-Encoding"] == "gzip"
 
         txt = response.body.decode("utf8")
         families = {
@@ -112,6 +114,32 @@ async def test_prometheus(c, s, a, b):
         assert client.samples[0].value == 1.0
 
 
+@gen_cluster(client=True, clean_kwargs={"threads": False})
+async def test_prometheus_gzip(c, s, a, b):
+    pytest.importorskip("prometheus_client")
+
+    http_client = AsyncHTTPClient()
+    url = "http://localhost:%d/metrics" % s.http_server.port
+
+    response = await http_client.fetch(url, decompress_response=False)
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    plain = response.body
+
+    response = await http_client.fetch(
+        url, headers={"Accept-Encoding": "gzip;q=0"}, decompress_response=False
+    )
+    assert "Content-Encoding" not in response.headers
+
+    response = await http_client.fetch(
+        url, headers={"Accept-Encoding": "gzip"}, decompress_response=False
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert len(response.body) < len(plain)
+    assert gzip.decompress(response.body).startswith(b"# HELP")
+
+
 @gen_cluster(client=True, clean_kwargs={"threads": False})
 async def test_prometheus_collect_task_states(c, s, a, b):
     pytest.importorskip("prometheus_client")
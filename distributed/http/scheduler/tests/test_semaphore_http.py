@@ -1,33 +1,19 @@
 from __future__ import annotations
 
+import re
+
 import pytest
-from tornado.httpclient import AsyncHTTPClient
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
 
 from distributed import Semaphore
 from distributed.utils_test import gen_cluster
 
+# HELP, TYPE and sample lines of the dask_semaphore_ families. Only these are
+# decoded and handed to prometheus_client's pure Python parser.
+SEMAPHORE_LINES = re.compile(rb"^(?:# (?:HELP|TYPE) )?dask_semaphore_.*$", re.MULTILINE)
 
-@gen_cluster(client=True, clean_kwargs={"threads": False})
-async def test_prometheus_collect_task_states(c, s, a, b):
-    pytest.importorskip("prometheus_client")
-    from prometheus_client.parser import text_string_to_metric_families
-
-    http_client = AsyncHTTPClient()
-
-    async def fetch_metrics():
-        port = s.http_server.port
-        response = await http_client.fetch(f"http://localhost:{port}/metrics")
-        txt = response.body.decode("utf8")
-        families = {
-            family.name: family
-            for family in text_string_to_metric_families(txt)
-            if family.name.startswith("dask_semaphore_")
-        }
-        return families
-
-    active_metrics = await fetch_metrics()
-
-    expected_metrics = {
+EXPECTED_METRICS = frozenset(
+    {
         "dask_semaphore_max_leases",
         "dask_semaphore_active_leases",
         "dask_semaphore_pending_leases",
@@ -35,52 +21,82 @@ async def test_prometheus_collect_task_states(c, s, a, b):
         "dask_semaphore_release",
         "dask_semaphore_average_pending_lease_time_s",
     }
+)
 
-    assert active_metrics.keys() == expected_metrics
-    for v in active_metrics.values():  # Not yet any semaphore created
-        assert v.samples == []
-
-    sem = await Semaphore(name="test", max_leases=2)
-
-    active_metrics = await fetch_metrics()
-    assert active_metrics.keys() == expected_metrics
-    # Assert values are set upon intialization
-    for name, v in active_metrics.items():
-        samples = v.samples
-        assert len(samples) == 1
-        sample = samples.pop()
-        assert sample.labels["name"] == "test"
-        if name == "dask_semaphore_max_leases":
-            assert sample.value == 2
-        else:
-            assert sample.value == 0
-
-    assert await sem.acquire()
-    active_metrics = await fetch_metrics()
-    assert active_metrics["dask_semaphore_max_leases"].samples[0].value == 2
-    assert active_metrics["dask_semaphore_active_leases"].samples[0].value == 1
-    assert (
-        active_metrics["dask_semaphore_average_pending_lease_time_s"].samples[0].value
-        > 0
-    )
-    assert active_metrics["dask_semaphore_acquire"].samples[0].value == 1
-    assert active_metrics["dask_semaphore_release"].samples[0].value == 0
-    assert active_metrics["dask_semaphore_pending_leases"].samples[0].value == 0
-
-    assert await sem.release() is True
-    active_metrics = await fetch_metrics()
-    assert active_metrics["dask_semaphore_max_leases"].samples[0].value == 2
-    assert active_metrics["dask_semaphore_active_leases"].samples[0].value == 0
-    assert (
-        active_metrics["dask_semaphore_average_pending_lease_time_s"].samples[0].value
-        > 0
+# Every family is still exposed, just without samples
+NO_SAMPLES = dict.fromkeys(EXPECTED_METRICS, [])
+
+
+@gen_cluster(client=True, nthreads=[], clean_kwargs={"threads": False})
+async def test_prometheus_collect_task_states(c, s):
+    pytest.importorskip("prometheus_client")
+    from prometheus_client.parser import text_string_to_metric_families
+
+    # Private client so that it's torn down with the test and a stalled scrape
+    # fails fast instead of hitting Tornado's 20s default timeouts
+    http_client = AsyncHTTPClient(
+        force_instance=True,
+        max_clients=1,
+        defaults=dict(connect_timeout=5, request_timeout=10),
     )
-    assert active_metrics["dask_semaphore_acquire"].samples[0].value == 1
-    assert active_metrics["dask_semaphore_release"].samples[0].value == 1
-    assert active_metrics["dask_semaphore_pending_leases"].samples[0].value == 0
-
-    await sem.close()
-    active_metrics = await fetch_metrics()
-    assert active_metrics.keys() == expected_metrics
-    for v in active_metrics.values():
-        assert v.samples == []
+    # Built once; Tornado only wraps it with the client defaults on each fetch
+    request = HTTPRequest(f"http://localhost:{s.http_server.port}/metrics")
+
+    async def fetch_metrics():
+        response = await http_client.fetch(request)
+        txt = b"\n".join(SEMAPHORE_LINES.findall(response.body)).decode("utf8")
+        return {family.name: family for family in text_string_to_metric_families(txt)}
+
+    async def fetch_values():
+        """Flatten a scrape into ``{family: value}`` of the single "test" sample"""
+        values = {}
+        for name, v in (await fetch_metrics()).items():
+            [sample] = v.samples
+            assert sample.labels == {"name": "test"}
+            values[name] = sample.value
+        return values
+
+    try:
+        # The collector only emits samples for semaphores known to the
+        # extension; the empty scrape itself is covered after sem.close()
+        assert not s.extensions["semaphores"].max_leases
+
+        sem = await Semaphore(name="test", max_leases=2)
+
+        # Assert values are set upon intialization
+        assert await fetch_values() == {
+            "dask_semaphore_max_leases": 2,
+            "dask_semaphore_active_leases": 0,
+            "dask_semaphore_pending_leases": 0,
+            "dask_semaphore_acquire": 0,
+            "dask_semaphore_release": 0,
+            "dask_semaphore_average_pending_lease_time_s": 0,
+        }
+
+        assert await sem.acquire()
+        values = await fetch_values()
+        assert values.pop("dask_semaphore_average_pending_lease_time_s") > 0
+        assert values == {
+            "dask_semaphore_max_leases": 2,
+            "dask_semaphore_active_leases": 1,
+            "dask_semaphore_pending_leases": 0,
+            "dask_semaphore_acquire": 1,
+            "dask_semaphore_release": 0,
+        }
+
+        assert await sem.release() is True
+        values = await fetch_values()
+        assert values.pop("dask_semaphore_average_pending_lease_time_s") > 0
+        assert values == {
+            "dask_semaphore_max_leases": 2,
+            "dask_semaphore_active_leases": 0,
+            "dask_semaphore_pending_leases": 0,
+            "dask_semaphore_acquire": 1,
+            "dask_semaphore_release": 1,
+        }
+
+        await sem.close()
+        active_metrics = await fetch_metrics()
+        assert {name: v.samples for name, v in active_metrics.items()} == NO_SAMPLES
+    finally:
+        http_client.close()
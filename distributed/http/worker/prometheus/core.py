@@ -2,8 +2,7 @@ from __future__ import annotations
 
 import logging
 
-from distributed.http.prometheus import PrometheusCollector
-from distributed.http.utils import RequestHandler
+from distributed.http.prometheus import BasePrometheusHandler, PrometheusCollector
 
 
 class WorkerMetricCollector(PrometheusCollector):
@@ -76,7 +75,7 @@ class WorkerMetricCollector(PrometheusCollector):
             )
 
 
-class PrometheusHandler(RequestHandler):
+class PrometheusHandler(BasePrometheusHandler):
     _initialized = False
 
     def __init__(self, *args, **kwargs):
@@ -90,9 +89,3 @@ class PrometheusHandler(RequestHandler):
         prometheus_client.REGISTRY.register(WorkerMetricCollector(self.server))
 
         PrometheusHandler._initialized = True
-
-    def get(self):
-        import prometheus_client
-
-        self.write(prometheus_client.generate_latest())
-        self.set_header("Content-Type", "text/plain; version=0.0.4")
@@ -23,6 +23,7 @@ async def test_prometheus(c, s, a, b):
         )
         assert response.code == 200
         assert response.headers["Content-Type"] == "text/plain; version=0.0.4"
+        assert response.headers["X-Consumed-Content-Encoding"] == "gzip"
 
         txt = response.body.decode("utf8")
         families = {familiy.name for familiy in text_string_to_metric_families(txt)}
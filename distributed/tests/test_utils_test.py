@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import gc
 import os
 import pathlib
 import signal
@@ -9,6 +10,7 @@ import subprocess
 import sys
 import textwrap
 import threading
+import weakref
 from contextlib import contextmanager
 from multiprocessing.synchronize import Barrier
 from time import sleep
@@ -22,7 +24,7 @@ import dask.config
 
 from distributed import Client, Event, Nanny, Scheduler, Worker, config, default_client
 from distributed.batched import BatchedSend
-from distributed.comm.core import connect
+from distributed.comm.core import CommClosedError, connect, listen
 from distributed.compatibility import WINDOWS
 from distributed.core import Server, Status, rpc
 from distributed.metrics import time
@@ -30,20 +32,27 @@ from distributed.tests.test_batched import EchoServer
 from distributed.utils import get_mp_context
 from distributed.utils_test import (
     _LockedCommPool,
+    _readone_queues,
     _UnhashableCallable,
     assert_story,
+    async_wait_for,
     captured_logger,
     check_process_leak,
+    check_thread_leak,
     cluster,
     dump_cluster_state,
     freeze_batched_send,
+    freeze_data_fetching,
     gen_cluster,
     gen_test,
     inc,
     new_config,
     popen,
     raises_with_cause,
+    readone,
+    save_sys_modules,
     tls_only_security,
+    wait_for,
     wait_for_state,
     wait_for_stimulus,
 )
@@ -269,6 +278,18 @@ def test_new_config():
     assert "xyzzy" not in config
 
 
+def test_save_sys_modules(tmp_path):
+    old_path = list(sys.path)
+    (tmp_path / "save_sys_modules_mod.py").write_text("x = 1")
+    with save_sys_modules():
+        sys.path.insert(0, str(tmp_path))
+        import save_sys_modules_mod  # noqa: F401
+
+        assert "save_sys_modules_mod" in sys.modules
+    assert "save_sys_modules_mod" not in sys.modules
+    assert sys.path == old_path
+
+
 def test_lingering_client():
     @gen_cluster()
     async def f(s, a, b):
@@ -305,6 +326,43 @@ def test__UnhashableCallable():
         hash(func)
 
 
+@gen_test()
+async def test_readone():
+    async def handle_comm(comm):
+        await comm.write([1, 2])
+        await comm.write([3])
+        await comm.close()
+
+    async with listen("inproc://", handle_comm) as listener:
+        comm = await connect(listener.contact_address)
+        assert [await readone(comm) for _ in range(3)] == [1, 2, 3]
+        with pytest.raises(CommClosedError):
+            await readone(comm)
+        await comm.close()
+
+
+@gen_test()
+async def test_readone_reaps_dropped_comm():
+    async def handle_comm(comm):
+        await comm.write([1, 2])
+        await comm.close()
+
+    n_queues = len(_readone_queues)
+    async with listen("inproc://", handle_comm) as listener:
+        comm = await connect(listener.contact_address)
+        assert await readone(comm) == 1
+        # Wait for the background reader to hit EOF, leaving 2 unread
+        q, _ = _readone_queues[comm]
+        await async_wait_for(lambda: not q.empty(), timeout=5)
+        await comm.close()
+
+        ref = weakref.ref(comm)
+        del comm
+        gc.collect()
+        assert ref() is None
+        assert len(_readone_queues) == n_queues
+
+
 class MyServer(Server):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -399,6 +457,38 @@ async def test_locked_comm_intercept_write(loop):
         assert await fut == "pong"
 
 
+def test_wait_for_max_period():
+    calls = []
+
+    def predicate():
+        calls.append(time())
+        return len(calls) == 5
+
+    wait_for(predicate, timeout=5, period=0.01, max_period=0.02)
+    intervals = [b - a for a, b in zip(calls, calls[1:])]
+    assert intervals[0] >= 0.01
+    assert intervals[-1] >= 0.02
+
+
+def test_wait_for_max_period_timeout():
+    with pytest.raises(pytest.fail.Exception, match="condition not reached"):
+        wait_for(lambda: False, timeout=0.1, period=0.01, max_period=0.05)
+
+
+@gen_test()
+async def test_async_wait_for_max_period():
+    calls = []
+
+    def predicate():
+        calls.append(time())
+        return len(calls) == 5
+
+    await async_wait_for(predicate, timeout=5, period=0.01, max_period=0.02)
+    intervals = [b - a for a, b in zip(calls, calls[1:])]
+    assert intervals[0] >= 0.01
+    assert intervals[-1] >= 0.02
+
+
 @pytest.mark.slow()
 def test_dump_cluster_state_timeout(tmp_path):
     sleep_time = 30
@@ -651,6 +741,45 @@ def test_check_process_leak_post_cleanup(ignore_sigterm):
     assert not p.is_alive()
 
 
+def test_check_thread_leak_waits_for_exiting_thread():
+    event = threading.Event()
+    with check_thread_leak():
+        t = threading.Thread(target=event.wait, args=(1,))
+        t.start()
+        threading.Timer(0.1, event.set).start()
+    assert not t.is_alive()
+
+
+def test_check_thread_leak_thread_started_by_other_thread(monkeypatch):
+    # A thread started by another thread may be enumerated before it is running,
+    # when it can't be joined yet. Widen that window by reporting the thread as
+    # soon as it is created.
+    enumerate_threads = threading.enumerate
+    created = []
+    monkeypatch.setattr(
+        threading,
+        "enumerate",
+        lambda: enumerate_threads() + [t for t in created if t.ident is None],
+    )
+    go = threading.Event()
+
+    def spawn():
+        go.wait()
+        t = threading.Thread(target=sleep, args=(0.1,))
+        created.append(t)
+        sleep(0.1)
+        t.start()
+
+    spawner = threading.Thread(target=spawn)
+    spawner.start()
+    with check_thread_leak():
+        go.set()
+        while not created:
+            sleep(0.01)
+    spawner.join()
+    assert not created[0].is_alive()
+
+
 @pytest.mark.parametrize("nanny", [True, False])
 def test_start_failure_worker(nanny):
     if nanny:
@@ -977,3 +1106,16 @@ def test_ws_with_running_task(ws_with_running_task):
     assert ws.available_resources == {"R": 0}
     assert ws.total_resources == {"R": 1}
     assert ts.state in ("executing", "long-running")
+
+
+@gen_cluster(nthreads=[("", 1)])
+async def test_freeze_data_fetching_restores_on_error(s, a):
+    total_out_connections = a.state.total_out_connections
+    comm_threshold_bytes = a.state.comm_threshold_bytes
+    with pytest.raises(ZeroDivisionError):
+        with freeze_data_fetching(a):
+            assert a.state.total_out_connections == 0
+            assert a.state.comm_threshold_bytes == 0
+            1 / 0
+    assert a.state.total_out_connections == total_out_connections
+    assert a.state.comm_threshold_bytes == comm_threshold_bytes